@@ -1,13 +1,22 @@
 import os
 import flickrapi
 import logging
-import json
+import logging.handlers
+import queue
+import atexit
+import orjson
 from tqdm import tqdm
 from dotenv import load_dotenv
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime
+from urllib.parse import urlparse
 import time
 import random
+import re
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # ---------------- LOAD ENVIRONMENT VARIABLES ----------------
 load_dotenv()
@@ -20,58 +29,177 @@ BASE_DIR = os.getenv("BASE_DIR")
 LOG_FILE = os.path.join(BASE_DIR, os.getenv("LOG_FILE"))
 PROGRESS_FILE = os.path.join(BASE_DIR, os.getenv("PROGRESS_FILE"))
 ERRORS_FILE = os.path.join(BASE_DIR, "download_errors.json")
+ERRORS_LOG_FILE = os.path.join(BASE_DIR, "download_errors.ndjson")
+COMPLETED_FILE = os.path.join(BASE_DIR, "completed.ndjson")
+
+# Extra fields requested with each album page so items carry their media type and
+# size URLs, saving the per-photo getInfo/getSizes calls
+PHOTO_EXTRAS = 'media,url_o,url_k,url_h,url_l,url_c,url_m,url_n,url_z,url_sq,height_o,width_o'
+
+# Size labels as returned by getSizes, mapped to their url_* extras suffix
+EXTRAS_SIZE_SUFFIXES = {
+    'Original': 'o',
+    'Large 2048': 'k',
+    'Large 1600': 'h',
+    'Large': 'l',
+    'Medium 800': 'c',
+    'Medium': 'm',
+}
+
+# Download preference, best first (video labels are matched lowercased, by substring)
+PHOTO_PRIORITY = ('Original', 'Large 2048', 'Large 1600', 'Large', 'Medium 800', 'Medium')
+VIDEO_PRIORITY = ('video original', 'site mp4', 'mobile mp4', 'hd mp4', '720p', '1080p')
+
+# File extension at the end of a URL path (match against urlparse(url).path)
+EXT_RE = re.compile(r'\.([a-zA-Z0-9]{1,4})$')
 
 # Specific album mode (optional - leave empty to download all albums)
 SPECIFIC_ALBUM = os.getenv("SPECIFIC_ALBUM", "")  # e.g., "Julio 2013"
 
 # Rate limiting configuration
-DELAY_BETWEEN_DOWNLOADS = 0.8  # seconds between downloads (more aggressive)
-DELAY_AFTER_429 = 60  # seconds to wait if we receive 429 (more conservative)
-MAX_RETRIES_429 = 5  # maximum attempts for 429 errors
-ADAPTIVE_DELAY = True  # If True, increases delay after multiple 429s
-
-# Global counter for adaptive adjustment
-rate_limit_count = 0
-
-# Error tracking
-download_errors = {
-    "failed_photos": [],
-    "failed_videos": [],
-    "no_url_videos": []
-}
+API_CALLS_PER_SECOND = 5  # sustained Flickr API call rate
+API_BURST = 10  # API calls allowed back-to-back when idle
+DOWNLOADS_PER_SECOND = 2  # sustained file download rate
+DOWNLOAD_BURST = 5  # downloads allowed back-to-back when idle
+BACKOFF_BASE = 0.5  # seconds to wait after the first 429, doubled on each one
+BACKOFF_MAX = 60  # upper bound for a single 429 back-off, in seconds
+MAX_429_ATTEMPTS = 7  # give up on a file after this many 429 responses
+MAX_RETRIES_429 = 5  # attempts per size for other errors (doubled for Original and videos)
+
+# Download I/O configuration
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # bytes copied from the response per read
+WRITE_BUFFER_SIZE = 1024 * 1024  # file buffer size for downloaded files
+
+# Concurrency configuration
+MAX_WORKERS = max(1, int(os.getenv("MAX_WORKERS") or 8))  # parallel downloads per album
+
+# Shared HTTP session so worker threads reuse keep-alive connections
+session = requests.Session()
+adapter = HTTPAdapter(pool_connections=16, pool_maxsize=max(32, MAX_WORKERS), max_retries=0)
+session.mount('https://', adapter)
+session.mount('http://', adapter)
+session.headers.update({
+    'User-Agent': 'flickr-album-downloader',
+    'Accept-Encoding': 'gzip',
+})
 
 os.makedirs(BASE_DIR, exist_ok=True)
 
 # ---------------- LOGGING ----------------
-logging.basicConfig(
-    filename=LOG_FILE,
-    filemode='w',
-    level=logging.INFO,
-    format='[%(asctime)s] %(message)s',
-)
+class TqdmHandler(logging.Handler):
+    """Writes log records through tqdm so they don't break progress bars"""
+
+    def emit(self, record):
+        try:
+            tqdm.write(self.format(record))
+        except Exception:
+            self.handleError(record)
 
-def log(msg):
-    print(msg)
-    logging.info(msg)
+# Workers only enqueue records; a background listener does the file/console I/O
+file_handler = logging.FileHandler(LOG_FILE, mode='w')
+file_handler.setFormatter(logging.Formatter('[%(asctime)s] %(message)s'))
+console_handler = TqdmHandler()
+console_handler.addFilter(logging.Filter(__name__))
+
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+queue_handler = logging.handlers.QueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
+logger = logging.getLogger(__name__)
+log = logger.info
 
 # ---------------- PROGRESS TRACKING ----------------
 progress = {"last_album": None}
 if os.path.exists(PROGRESS_FILE):
-    with open(PROGRESS_FILE) as f:
+    with open(PROGRESS_FILE, 'rb') as f:
         try:
-            progress.update(json.load(f))
+            progress.update(orjson.loads(f.read()))
         except Exception:
             pass
 
 def save_progress(last_album):
-    with open(PROGRESS_FILE, 'w') as f:
-        json.dump({"last_album": last_album}, f, indent=2)
+    with open(PROGRESS_FILE, 'wb') as f:
+        f.write(orjson.dumps({"last_album": last_album}, option=orjson.OPT_INDENT_2))
     log(f"💾 Progress updated: {last_album}")
 
+# Items already downloaded, keyed by (album, photo_id), one JSON record per line
+completed = {}
+completed_lock = threading.Lock()
+if os.path.exists(COMPLETED_FILE):
+    with open(COMPLETED_FILE, 'rb') as f:
+        for line in f:
+            try:
+                record = orjson.loads(line)
+                completed[(record['album'], record['photo_id'])] = record['file']
+            except Exception:
+                pass
+
+def mark_completed(album_title, photo_id, filename, label):
+    """Records a downloaded item so later runs skip it without API calls"""
+    key = (album_title, photo_id)
+    with completed_lock:
+        if key in completed:
+            return
+        completed[key] = filename
+        with open(COMPLETED_FILE, 'ab') as f:
+            f.write(orjson.dumps({"album": album_title, "photo_id": photo_id, "file": filename,
+                                  "label": label}, option=orjson.OPT_APPEND_NEWLINE))
+
+# ---------------- ERROR TRACKING ----------------
+# Failures are appended to an NDJSON log as they happen, so they survive a crash
+# and later runs
+ERROR_CATEGORIES = ("failed_photos", "failed_videos", "no_url_videos")
+errors_lock = threading.Lock()
+errors_fh = open(ERRORS_LOG_FILE, 'ab', buffering=8192)
+atexit.register(errors_fh.close)
+# Start on a fresh line if a killed run left a torn record at the end
+if errors_fh.tell() > 0:
+    with open(ERRORS_LOG_FILE, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b'\n':
+            errors_fh.write(b'\n')
+
+# Items downloaded in this run (in any size), whose older failures are obsolete
+succeeded = set()
+
+def record_error(category, record):
+    """Appends one failure to the NDJSON error log"""
+    line = orjson.dumps({"type": category, **record}, option=orjson.OPT_APPEND_NEWLINE)
+    with errors_lock:
+        errors_fh.write(line)
+        errors_fh.flush()
+
 def save_errors():
-    """Save error report to JSON file"""
-    with open(ERRORS_FILE, 'w') as f:
-        json.dump(download_errors, f, indent=2)
+    """Aggregate the NDJSON error log into the JSON error report"""
+    with errors_lock:
+        errors_fh.flush()
+    # Keep the latest record per item, dropping items downloaded since they failed
+    latest = {}
+    with open(ERRORS_LOG_FILE, 'rb') as f:
+        for line in f:
+            # Skip blank lines and records torn by a killed run
+            try:
+                record = orjson.loads(line)
+                category = record["type"]
+            except Exception:
+                continue
+            if category not in ERROR_CATEGORIES:
+                continue
+            item = (record.get("album"), record.get("photo_id"))
+            if item in completed or item in succeeded:
+                continue
+            latest[(record["type"], *item)] = record
+    
+    download_errors = {category: [] for category in ERROR_CATEGORIES}
+    for record in latest.values():
+        download_errors[record.pop("type")].append(record)
+    
+    with open(ERRORS_FILE, 'wb') as f:
+        f.write(orjson.dumps(download_errors, option=orjson.OPT_INDENT_2))
     
     # Print summary
     total_errors = (len(download_errors['failed_photos']) + 
@@ -87,12 +215,52 @@ def save_errors():
     else:
         log(f"✅ No errors! All files downloaded successfully.")
 
+# ---------------- RATE LIMITING ----------------
+class TokenBucket:
+    """Thread-safe token bucket shared by all workers"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Blocks until the requested tokens are available and takes them"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now >= self.updated:
+                    elapsed = now - self.updated
+                    self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+                    self.updated = now
+                    if self.tokens >= tokens:
+                        self.tokens -= tokens
+                        return
+                    wait = (tokens - self.tokens) / self.rate
+                else:
+                    # Still penalized after a 429
+                    wait = self.updated - now
+            time.sleep(wait)
+
+    def penalize(self, wait_time):
+        """Empties the bucket and stops refilling it for wait_time seconds"""
+        with self.lock:
+            self.tokens = 0
+            self.updated = max(self.updated, time.monotonic() + wait_time)
+
+API_LIMITER = TokenBucket(rate=API_CALLS_PER_SECOND, capacity=API_BURST)
+DL_LIMITER = TokenBucket(rate=DOWNLOADS_PER_SECOND, capacity=DOWNLOAD_BURST)
+
 # ---------------- AUTHENTICATION ----------------
 flickr = flickrapi.FlickrAPI(API_KEY, API_SECRET, format='parsed-json')
+# Reuses the token cached by flickrapi (~/.flickr) and only opens the browser without one
 flickr.authenticate_via_browser(perms='read')
 log("🔑 Authentication completed.")
 
 # ---------------- GET ALBUMS ----------------
+API_LIMITER.acquire()
 albums = flickr.photosets.getList(user_id=USER_ID)['photosets']['photoset']
 log(f"📚 Total albums: {len(albums)}")
 for i, a in enumerate(albums):
@@ -100,82 +268,143 @@ for i, a in enumerate(albums):
     log(f"{i+1}: {a['title']['_content']} (ID: {a['id']}, Date: {readable_date})")
 
 # ---------------- HELPER FUNCTIONS ----------------
+def backoff_delay(attempt_429, retry_after=None):
+    """Seconds to wait after the n-th 429: Retry-After if given, else capped exponential with jitter"""
+    if retry_after:
+        try:
+            return min(BACKOFF_MAX, max(0, int(retry_after)))
+        except ValueError:
+            pass
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** (attempt_429 - 1)))
+    return delay * random.uniform(0.5, 1.5)
+
 def download_file(url, path, retries=3):
     """Downloads file with adaptive rate limiting handling"""
-    global rate_limit_count
-    backoff_time = DELAY_AFTER_429
+    attempt_429 = 0
+    # Data goes to a .part file that only replaces path once complete
+    tmp = path + '.part'
     
-    for attempt in range(retries):
+    # 429 responses have their own budget (MAX_429_ATTEMPTS) and don't use up retries
+    attempt = 0
+    while attempt < retries:
+        headers = {}
+        mode = 'wb'
+        existing_size = os.path.getsize(tmp) if os.path.exists(tmp) else 0
+        if existing_size > 0:
+            # Leftover from an interrupted attempt: ask only for the missing bytes
+            headers['Range'] = f"bytes={existing_size}-"
+            headers['Accept-Encoding'] = 'identity'
+            mode = 'ab'
+        
+        DL_LIMITER.acquire()
         try:
-            r = requests.get(url, stream=True, timeout=60)
+            r = session.get(url, stream=True, timeout=60, headers=headers)
             
             # If we receive 429, wait and retry
             if r.status_code == 429:
-                rate_limit_count += 1
-                wait_time = backoff_time * (1.5 ** min(rate_limit_count, 3))
-                log(f"⏸️  Rate limit #{rate_limit_count}. Waiting {wait_time:.0f}s...")
-                time.sleep(wait_time)
-                backoff_time *= 2
+                r.close()
+                attempt_429 += 1
+                if attempt_429 > MAX_429_ATTEMPTS:
+                    log(f"❌ Rate limited {MAX_429_ATTEMPTS} times, giving up: {path}")
+                    return False
+                wait_time = backoff_delay(attempt_429, r.headers.get('Retry-After'))
+                log(f"⏸️  Rate limit #{attempt_429}. Waiting {wait_time:.1f}s...")
+                DL_LIMITER.penalize(wait_time)
                 continue
             
-            # If download was successful, reset counter
-            if r.status_code == 200:
-                rate_limit_count = max(0, rate_limit_count - 1)
+            # Nothing left past our offset: the .part file is either complete or stale
+            if r.status_code == 416 and mode == 'ab':
+                r.close()
+                total = r.headers.get('Content-Range', '').rpartition('/')[2]
+                if total == str(existing_size):
+                    os.replace(tmp, path)
+                    return True
+                log(f"⚠️ Discarding stale partial file: {tmp}")
+                os.remove(tmp)
+                continue
             
             r.raise_for_status()
             
-            with open(path, 'wb') as f:
-                for chunk in r.iter_content(1024):
-                    if chunk:
-                        f.write(chunk)
+            # Server ignored the Range header and sent the whole file
+            if mode == 'ab' and r.status_code != 206:
+                mode = 'wb'
+            elif mode == 'ab':
+                log(f"↪️  Resuming {os.path.basename(path)} from byte {existing_size}")
+            
+            content_length = int(r.headers.get('Content-Length') or 0)
+            # No preallocation: the .part size must always equal the bytes received,
+            # since a later attempt trusts it to resume or to detect completion
+            with open(tmp, mode, buffering=WRITE_BUFFER_SIZE) as f:
+                try:
+                    # Let urllib3 undo any transfer encoding, then copy in large blocks
+                    r.raw.decode_content = True
+                    shutil.copyfileobj(r.raw, f, length=DOWNLOAD_CHUNK_SIZE)
+                finally:
+                    # Even if the copy fails, leave exactly the bytes written
+                    f.truncate(f.tell())
+                f.flush()
+                os.fsync(f.fileno())
+            
+            # Never promote the .part file unless every promised byte arrived
+            if content_length:
+                received = r.raw.tell()  # bytes read off the wire, before decoding
+                if received != content_length:
+                    raise IOError(f"short read: received {received} of {content_length} bytes")
+            size = os.path.getsize(tmp)
+            # Content-Length counts encoded bytes, so only compare unencoded bodies
+            if content_length and not r.headers.get('Content-Encoding'):
+                expected = content_length + (existing_size if mode == 'ab' else 0)
+                if size != expected:
+                    raise IOError(f"short read: got {size} of {expected} bytes")
             
-            size = os.path.getsize(path)
             if size > 0:
+                os.replace(tmp, path)
                 return True
             else:
                 log(f"⚠️ File 0 bytes (attempt {attempt+1}/{retries}): {path}")
-                if os.path.exists(path):
-                    os.remove(path)
+                os.remove(tmp)
         except requests.exceptions.HTTPError as e:
-            if '429' in str(e):
-                rate_limit_count += 1
-                wait_time = backoff_time * (1.5 ** min(rate_limit_count, 3))
-                log(f"⏸️  Rate limit #{rate_limit_count} on attempt {attempt+1}. Waiting {wait_time:.0f}s...")
-                time.sleep(wait_time)
-                backoff_time *= 2
-            else:
-                log(f"❌ HTTP error downloading (attempt {attempt+1}/{retries}): {e}")
+            log(f"❌ HTTP error downloading (attempt {attempt+1}/{retries}): {e}")
         except Exception as e:
+            # Keep partial data so the next attempt can resume with a Range request
             log(f"❌ Error downloading {path} (attempt {attempt+1}/{retries}): {e}")
-            if os.path.exists(path):
-                os.remove(path)
         
-        if attempt < retries - 1:
+        attempt += 1
+        if attempt < retries:
             time.sleep(2)
     
     return False
 
-def download_photo_with_fallback(photo_id, album_dir, album_title):
+def sizes_from_extras(item):
+    """Builds a getSizes-like list from the url_* extras of an album item"""
+    sizes = []
+    for label, suffix in EXTRAS_SIZE_SUFFIXES.items():
+        url = item.get(f"url_{suffix}")
+        if url:
+            sizes.append({"label": label, "source": url})
+    return sizes
+
+def download_photo_with_fallback(photo_id, album_dir, album_title, existing, sizes=None):
     """Attempts to download photo ALWAYS prioritizing Original size"""
     try:
-        sizes = flickr.photos.getSizes(photo_id=photo_id)['sizes']['size']
+        if not sizes:
+            API_LIMITER.acquire()
+            sizes = flickr.photos.getSizes(photo_id=photo_id)['sizes']['size']
     except Exception as e:
         log(f"❌ Error getting sizes for {photo_id}: {e}")
-        download_errors['failed_photos'].append({
+        record_error('failed_photos', {
             "album": album_title,
             "photo_id": photo_id,
             "error": str(e)
         })
         return False
     
-    priority_order = ['Original', 'Large 2048', 'Large 1600', 'Large', 'Medium 800', 'Medium']
+    size_by_label = {s['label']: s for s in sizes if s.get('source')}
+    # Only the best available size counts as done; fallbacks retry it next run
+    best_label = next((label for label in PHOTO_PRIORITY if label in size_by_label), None)
     
-    for priority_index, label in enumerate(priority_order):
-        matching_size = None
-        for s in sizes:
-            if s['label'] == label and s.get('source'):
-                matching_size = s
-                break
+    for label in PHOTO_PRIORITY:
+        matching_size = size_by_label.get(label)
         
         if not matching_size:
             if label == 'Original':
@@ -183,20 +412,17 @@ def download_photo_with_fallback(photo_id, album_dir, album_title):
             continue
         
         url = matching_size['source']
-        ext = url.split('?')[0].split('.')[-1]
+        ext_match = EXT_RE.search(urlparse(url).path)
+        ext = ext_match.group(1) if ext_match else 'jpg'
         filename = f"{photo_id}_{label.replace(' ', '_')}.{ext}"
         filepath = os.path.join(album_dir, filename)
         
-        if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
+        if existing.get(filename, 0) > 0:
             log(f"✓ Already exists: {filename}")
+            if label == best_label:
+                mark_completed(album_title, photo_id, filename, label)
             return True
         
-        current_delay = DELAY_BETWEEN_DOWNLOADS
-        if ADAPTIVE_DELAY and rate_limit_count > 0:
-            current_delay *= (1 + rate_limit_count * 0.5)
-        
-        time.sleep(current_delay + random.uniform(0, 0.5))
-        
         max_retries = MAX_RETRIES_429 * 2 if label == 'Original' else MAX_RETRIES_429
         
         log(f"🔄 Attempting to download {photo_id} as {label}... ({max_retries} max attempts)")
@@ -204,9 +430,16 @@ def download_photo_with_fallback(photo_id, album_dir, album_title):
         
         if ok:
             size = os.path.getsize(filepath)
+            existing[filename] = size
             log(f"⬇️ Photo downloaded: {filename} ({size} bytes)")
+            if label == best_label:
+                mark_completed(album_title, photo_id, filename, label)
             return True
         else:
+            # Giving up on this size: don't leave its partial data behind
+            part_path = filepath + '.part'
+            if os.path.exists(part_path):
+                os.remove(part_path)
             if label == 'Original':
                 log(f"⚠️ ⚠️ ⚠️ FAILED to download ORIGINAL for {photo_id} after {max_retries} attempts")
                 log(f"      → Falling back to smaller sizes...")
@@ -218,7 +451,7 @@ def download_photo_with_fallback(photo_id, album_dir, album_title):
     available_sizes = [s['label'] for s in sizes]
     log(f"ℹ️ Available sizes for {photo_id}: {', '.join(available_sizes)}")
     
-    download_errors['failed_photos'].append({
+    record_error('failed_photos', {
         "album": album_title,
         "photo_id": photo_id,
         "available_sizes": available_sizes
@@ -226,72 +459,63 @@ def download_photo_with_fallback(photo_id, album_dir, album_title):
     
     return False
 
-def download_video(photo_id, album_dir, album_title):
+def download_video(photo_id, album_dir, album_title, existing):
     """Downloads video from Flickr"""
     try:
+        API_LIMITER.acquire()
         sizes = flickr.photos.getSizes(photo_id=photo_id)['sizes']['size']
         
         video_url = None
         video_label = None
         
-        video_priority = ['Video Original', 'Site MP4', 'Mobile MP4', 'HD MP4', '720p', '1080p']
+        size_by_label_lower = {s['label'].lower(): s for s in sizes if s.get('source')}
         
-        for priority_label in video_priority:
-            for s in sizes:
-                if priority_label.lower() in s['label'].lower():
-                    video_url = s.get('source')
-                    video_label = s['label']
-                    if video_url:
-                        break
-            if video_url:
+        for priority_label in VIDEO_PRIORITY:
+            match = next((s for k, s in size_by_label_lower.items() if priority_label in k), None)
+            if match:
+                video_url = match['source']
+                video_label = match['label']
                 break
         
         if not video_url:
-            for s in sizes:
-                label_lower = s['label'].lower()
-                if 'video' in label_lower or 'mp4' in label_lower:
-                    video_url = s.get('source')
-                    video_label = s['label']
-                    if video_url:
-                        break
+            match = next((s for k, s in size_by_label_lower.items() if 'video' in k or 'mp4' in k), None)
+            if match:
+                video_url = match['source']
+                video_label = match['label']
         
         if not video_url:
             log(f"❌ No video URL found for {photo_id}")
             log(f"ℹ️ Available sizes: {', '.join([s['label'] for s in sizes])}")
-            download_errors['no_url_videos'].append({
+            record_error('no_url_videos', {
                 "album": album_title,
                 "photo_id": photo_id,
                 "available_sizes": [s['label'] for s in sizes]
             })
             return False
         
-        ext = video_url.split('?')[0].split('.')[-1]
-        if not ext or len(ext) > 4:
-            ext = 'mp4'
+        ext_match = EXT_RE.search(urlparse(video_url).path)
+        ext = ext_match.group(1) if ext_match else 'mp4'
         
         filename = f"{photo_id}_video_{video_label.replace(' ', '_')}.{ext}"
         filepath = os.path.join(album_dir, filename)
         
-        if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
+        if existing.get(filename, 0) > 0:
             log(f"✓ Already exists: {filename}")
+            mark_completed(album_title, photo_id, filename, video_label)
             return True
         
-        current_delay = DELAY_BETWEEN_DOWNLOADS
-        if ADAPTIVE_DELAY and rate_limit_count > 0:
-            current_delay *= (1 + rate_limit_count * 0.5)
-        
-        time.sleep(current_delay + random.uniform(0, 0.5))
-        
         log(f"🔄 Attempting to download video {photo_id} as {video_label}...")
         ok = download_file(video_url, filepath, retries=MAX_RETRIES_429 * 2)
         
         if ok:
             size = os.path.getsize(filepath)
+            existing[filename] = size
             log(f"⬇️ Video downloaded: {filename} ({size} bytes)")
+            mark_completed(album_title, photo_id, filename, video_label)
             return True
         else:
             log(f"❌ Failed to download video: {photo_id}")
-            download_errors['failed_videos'].append({
+            record_error('failed_videos', {
                 "album": album_title,
                 "photo_id": photo_id,
                 "url": video_url,
@@ -301,17 +525,52 @@ def download_video(photo_id, album_dir, album_title):
             
     except Exception as e:
         log(f"❌ Error downloading video {photo_id}: {e}")
-        download_errors['failed_videos'].append({
+        record_error('failed_videos', {
             "album": album_title,
             "photo_id": photo_id,
             "error": str(e)
         })
         return False
 
+def fetch_album_page(album_id, page, per_page):
+    """Fetches one page of album items, including media type and size URLs"""
+    API_LIMITER.acquire()
+    return flickr.photosets.getPhotos(photoset_id=album_id, user_id=USER_ID, page=page,
+                                      per_page=per_page, extras=PHOTO_EXTRAS)
+
+def scan_album_dir(album_dir):
+    """Maps file name -> size for everything already in an album folder"""
+    with os.scandir(album_dir) as entries:
+        return {e.name: e.stat(follow_symlinks=False).st_size for e in entries if e.is_file()}
+
+def process_item(item, album_dir, album_title, existing):
+    """Resolves the media type of an album item and downloads it"""
+    photo_id = item['id']
+    
+    if (album_title, photo_id) in completed:
+        return True
+    
+    media_type = item.get('media')
+    if not media_type:
+        try:
+            API_LIMITER.acquire()
+            media_type = flickr.photos.getInfo(photo_id=photo_id)['photo']['media']
+        except Exception as e:
+            log(f"❌ Error getting info for {photo_id}: {e}")
+            return False
+
+    if media_type == 'photo':
+        return download_photo_with_fallback(photo_id, album_dir, album_title, existing, sizes_from_extras(item))
+    elif media_type == 'video':
+        return download_video(photo_id, album_dir, album_title, existing)
+    else:
+        log(f"❌ Unsupported media type: {media_type} ({photo_id})")
+        return False
+
 # ---------------- DOWNLOAD ----------------
 skip = True if (progress.get("last_album") and not SPECIFIC_ALBUM) else False
 
-log(f"⏱️  Configuration: {DELAY_BETWEEN_DOWNLOADS}s between downloads, {DELAY_AFTER_429}s after 429")
+log(f"⏱️  Configuration: {DOWNLOADS_PER_SECOND} downloads/s, {API_CALLS_PER_SECOND} API calls/s, up to {BACKOFF_MAX}s back-off after 429, {MAX_WORKERS} workers")
 
 if SPECIFIC_ALBUM:
     log(f"🎯 SPECIFIC ALBUM MODE: Will only download '{SPECIFIC_ALBUM}'")
@@ -333,34 +592,49 @@ for album in albums:
         continue
 
     log(f"📁 Processing album: {album_title}")
+    existing = scan_album_dir(album_dir)
 
     page = 1
     per_page = 500
-    while True:
-        response = flickr.photosets.getPhotos(photoset_id=album_id, user_id=USER_ID, page=page, per_page=per_page)
-        items = response['photoset']['photo']
-        if not items:
-            break
-
-        for item in tqdm(items, desc=f"Downloading: {album_title}", unit="file"):
-            photo_id = item['id']
-            
-            try:
-                media_type = flickr.photos.getInfo(photo_id=photo_id)['photo']['media']
-            except Exception as e:
-                log(f"❌ Error getting info for {photo_id}: {e}")
-                continue
-
-            if media_type == 'photo':
-                download_photo_with_fallback(photo_id, album_dir, album_title)
-            elif media_type == 'video':
-                download_video(photo_id, album_dir, album_title)
-            else:
-                log(f"❌ Unsupported media type: {media_type} ({photo_id})")
-
-        if page >= response['photoset']['pages']:
-            break
-        page += 1
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor, \
+            ThreadPoolExecutor(max_workers=1) as page_fetcher:
+        next_page = page_fetcher.submit(fetch_album_page, album_id, page, per_page)
+        futures = {}
+        try:
+            while True:
+                response = next_page.result()
+                items = response['photoset']['photo']
+                if not items:
+                    break
+
+                # Fetch the following page while this one downloads
+                last_page = page >= response['photoset']['pages']
+                if not last_page:
+                    next_page = page_fetcher.submit(fetch_album_page, album_id, page + 1, per_page)
+
+                futures = {executor.submit(process_item, item, album_dir, album_title, existing): item['id']
+                           for item in items}
+                # Redraw at most twice a second, however fast items complete
+                with tqdm(total=len(futures), desc=f"Downloading: {album_title}", unit="file",
+                          miniters=10, mininterval=0.5) as pbar:
+                    for future in as_completed(futures):
+                        try:
+                            if future.result():
+                                succeeded.add((album_title, futures[future]))
+                        except Exception as e:
+                            log(f"❌ Unexpected error in worker: {e}")
+                        pbar.update(1)
+
+                if last_page:
+                    break
+                page += 1
+        except KeyboardInterrupt:
+            # Drop everything still queued; only in-flight downloads finish
+            log("🛑 Interrupted, cancelling queued downloads...")
+            next_page.cancel()
+            for future in futures:
+                future.cancel()
+            raise
 
     save_progress(album_title)
     log(f"✅ Album completed: {album_title}")